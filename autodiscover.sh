@@ -133,21 +133,14 @@ detect_nodes() {
     
     TEMP_IPS_FILE=$(mktemp)
     
-    # Scan in parallel
-    for ip in $ALL_IPS; do
-        # Skip own IP
-        if [[ "$ip" == "$LOCAL_IP" ]]; then continue; fi
-        
-        (
-            # Check port 22 with 1 second timeout
-            if nc -z -w 1 "$ip" 22 &>/dev/null; then
-                echo "$ip" >> "$TEMP_IPS_FILE"
-            fi
-        ) &
-    done
-    
-    # Wait for all background scans to complete
-    wait
+    # Scan in parallel, capped at SCAN_PARALLEL probes in flight so large
+    # subnets don't fork one process per address at once
+    # Check port 22 with 1 second timeout, skipping own IP. Most probes fail,
+    # which makes xargs exit non-zero; don't let that abort 'set -e' callers
+    grep -vxF "$LOCAL_IP" <<< "$ALL_IPS" \
+        | xargs -r -P "${SCAN_PARALLEL:-256}" -I{} \
+            sh -c 'nc -z -w 1 "$1" 22 >/dev/null 2>&1 && echo "$1"; exit 0' _ {} \
+        > "$TEMP_IPS_FILE" || true
     
     # Read found IPs
     if [[ -f "$TEMP_IPS_FILE" ]]; then
@@ -13,6 +13,7 @@ SSH_USER="$USER"
 NO_BUILD=false
 VLLM_REF="main"
 TMP_IMAGE=""
+TMP_FIFO_DIR=""
 PARALLEL_COPY=false
 EXP_MXFP4=false
 VLLM_REF_SET=false
@@ -33,6 +34,9 @@ cleanup() {
         echo "Cleaning up temporary image $TMP_IMAGE"
         rm -f "$TMP_IMAGE"
     fi
+    if [ -n "$TMP_FIFO_DIR" ] && [ -d "$TMP_FIFO_DIR" ]; then
+        rm -rf "$TMP_FIFO_DIR"
+    fi
 }
 
 trap cleanup EXIT
@@ -50,12 +54,16 @@ add_copy_hosts() {
     done
 }
 
+# copy_to_host HOST [SOURCE]
+# Loads the image read from SOURCE (default: $TMP_IMAGE) into HOST.
 copy_to_host() {
     local host="$1"
+    local src="${2:-$TMP_IMAGE}"
     echo "Loading image into ${SSH_USER}@${host}..."
     local host_copy_start host_copy_end host_copy_time
     host_copy_start=$(date +%s)
-    if cat "$TMP_IMAGE" | ssh "${SSH_USER}@${host}" "docker load"; then
+    # SSH_OPTIONS (e.g. a shared ControlPath from run-recipe.py) is intentionally unquoted
+    if ssh ${SSH_OPTIONS:-} "${SSH_USER}@${host}" "docker load" < "$src"; then
         host_copy_end=$(date +%s)
         host_copy_time=$((host_copy_end - host_copy_start))
         printf "Copy to %s completed in %02d:%02d:%02d\n" "$host" $((host_copy_time/3600)) $((host_copy_time%3600/60)) $((host_copy_time%60))
@@ -447,17 +455,22 @@ if [ "${#COPY_HOSTS[@]}" -gt 0 ]; then
     fi
     COPY_START=$(date +%s)
 
-    TMP_IMAGE=$(mktemp -t vllm_image.XXXXXX)
-    echo "Saving image locally to $TMP_IMAGE..."
-    docker save -o "$TMP_IMAGE" "$IMAGE_TAG"
-
     if [ "$PARALLEL_COPY" = true ]; then
+        # Stream a single 'docker save' to every host at once through one
+        # FIFO per host instead of staging the whole image on disk first
+        TMP_FIFO_DIR=$(mktemp -d -t vllm_image.XXXXXX)
+        FIFOS=()
         PIDS=()
-        for host in "${COPY_HOSTS[@]}"; do
-            copy_to_host "$host" &
+        for i in "${!COPY_HOSTS[@]}"; do
+            FIFOS+=("$TMP_FIFO_DIR/$i")
+            mkfifo "${FIFOS[$i]}"
+            copy_to_host "${COPY_HOSTS[$i]}" "${FIFOS[$i]}" &
             PIDS+=($!)
         done
+        echo "Streaming image to all hosts..."
         COPY_FAILURE=0
+        # warn-nopipe: a host that drops out mid-transfer doesn't stop the others
+        (set -o pipefail; docker save "$IMAGE_TAG" | tee --output-error=warn-nopipe "${FIFOS[@]}" > /dev/null) || COPY_FAILURE=1
         for pid in "${PIDS[@]}"; do
             if ! wait "$pid"; then
                 COPY_FAILURE=1
@@ -468,6 +481,10 @@ if [ "${#COPY_HOSTS[@]}" -gt 0 ]; then
             exit 1
         fi
     else
+        TMP_IMAGE=$(mktemp -t vllm_image.XXXXXX)
+        echo "Saving image locally to $TMP_IMAGE..."
+        docker save -o "$TMP_IMAGE" "$IMAGE_TAG"
+
         for host in "${COPY_HOSTS[@]}"; do
             copy_to_host "$host"
         done
@@ -40,6 +40,18 @@ MEM_SWAP_LIMIT_GB=""
 PIDS_LIMIT="4096"
 SHM_SIZE_GB="64"
 
+# Remove the launch script from the host if the caller handed it over as a
+# temp file (run-recipe.py execs into this script and can't clean up itself)
+remove_temp_launch_script() {
+    if [[ -n "${LAUNCH_SCRIPT_CLEANUP:-}" && "$LAUNCH_SCRIPT_PATH" == "$LAUNCH_SCRIPT_CLEANUP" ]]; then
+        rm -f "$LAUNCH_SCRIPT_PATH"
+    fi
+}
+
+# Make sure a handed-over temp script is removed on every exit path, including
+# argument and validation errors; the cleanup trap set later also removes it
+trap remove_temp_launch_script EXIT
+
 # Function to print usage
 usage() {
     echo "Usage: $0 [-n <node_ips>] [-t <image_name>] [--name <container_name>] [--eth-if <if_name>] [--ib-if <if_name>] [--nccl-debug <level>] [--check-config] [--solo] [-d] [action] [command]"
@@ -344,6 +356,7 @@ fi
 cleanup() {
     # Remove traps to prevent nested cleanup
     trap - EXIT INT TERM HUP
+    remove_temp_launch_script
 
     if [[ "$CLUSTER_WAS_RUNNING" == "true" ]]; then
         echo "Cluster was already running when script started. Skipping cleanup."
@@ -558,6 +571,7 @@ copy_launch_script_to_container() {
     docker exec "$container" chmod +x /workspace/exec-script.sh
 
     echo "  Launch script copied to head node"
+    remove_temp_launch_script
 }
 
 # Start Cluster Function
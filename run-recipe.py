@@ -83,19 +83,27 @@ RELATED FILES:
     - autodiscover.sh: Network topology detection
 """
 
+import _thread
 import argparse
+import collections
+import contextlib
+import functools
+import json
 import os
-import subprocess
+import re
+import shlex
+import string
 import sys
-import tempfile
+import time
+import types
+from collections.abc import Iterator, Mapping
 from pathlib import Path
 from typing import Any
 
-try:
-    import yaml
-except ImportError:
-    print("Error: PyYAML is required. Install with: pip install pyyaml")
-    sys.exit(1)
+# Heavier modules (yaml, subprocess, tempfile, concurrent.futures) are imported
+# inside the functions that use them, so fast paths like --help and --show-env
+# don't pay for them at startup. A warm --list skips yaml but still imports
+# concurrent.futures for its thread pool.
 
 
 SCRIPT_DIR = Path(__file__).parent.resolve()
@@ -105,9 +113,200 @@ BUILD_SCRIPT = SCRIPT_DIR / "build-and-copy.sh"
 DOWNLOAD_SCRIPT = SCRIPT_DIR / "hf-download.sh"
 AUTODISCOVER_SCRIPT = SCRIPT_DIR / "autodiscover.sh"
 ENV_FILE = SCRIPT_DIR / ".env"
+SHM_DIR = "/dev/shm"
 
+# Interactive prompts fall back to their default answer after this long
+PROMPT_TIMEOUT_S = 30
 
-def load_recipe(recipe_path: Path) -> dict[str, Any]:
+# A .env younger than this is reused instead of re-running autodiscover
+AUTODISCOVER_TTL_S = 300
+
+# Invocations made up only of these flags get a minimal parser
+_FAST_PATH_FLAGS = frozenset({"--list", "-l", "--show-env"})
+
+# CLI options (argparse dests) that override recipe defaults
+_OVERRIDE_KEYS = ("port", "host", "tensor_parallel", "gpu_memory_utilization", "max_model_len")
+
+# vLLM flags in extra args that duplicate one of our override options
+_FLAG_TO_OVERRIDE = types.MappingProxyType({
+    '--port': 'port',
+    '--host': 'host',
+    '--tensor-parallel-size': 'tensor_parallel',
+    '-tp': 'tensor_parallel',
+    '--gpu-memory-utilization': 'gpu_memory_utilization',
+    '--max-model-len': 'max_model_len',
+})
+
+# SSH connection multiplexing: every ssh started by this script (and by the
+# helper scripts, via the SSH_OPTIONS env var) shares one control socket per
+# host, so only the first connection pays the full handshake.
+SSH_CONTROL_PATH = "~/.ssh/run-recipe-%r@%h:%p"
+
+# SSH options for remote probes
+SSH_OPTIONS = [
+    "-o", "BatchMode=yes",
+    "-o", "StrictHostKeyChecking=no",
+    "-o", "ControlMaster=auto",
+    "-o", f"ControlPath={SSH_CONTROL_PATH}",
+    "-o", "ControlPersist=60s",
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _yaml_loader() -> tuple[Any, Any]:
+    """
+    Import PyYAML on first use and pick the fastest safe loader.
+    
+    Prefers the LibYAML-backed CSafeLoader, a drop-in replacement for
+    SafeLoader; prints a one-line hint if only the pure-Python one exists.
+    
+    Returns:
+        (yaml module, loader class)
+        
+    Raises:
+        SystemExit: If PyYAML is not installed
+    """
+    try:
+        import yaml
+    except ImportError:
+        print("Error: PyYAML is required. Install with: pip install pyyaml")
+        sys.exit(1)
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:
+        from yaml import SafeLoader as loader
+        print("Note: PyYAML was built without LibYAML; recipe parsing will be slower. "
+              "Install libyaml and reinstall PyYAML to enable the C loader.")
+    return yaml, loader
+
+
+def _recipe_cache_path(recipe_path: Path) -> Path:
+    """Return the JSON sidecar path used to cache a parsed recipe."""
+    return recipe_path.with_name(f"{recipe_path.name}.cache.json")
+
+
+def _read_recipe_file(recipe_path: Path) -> Any:
+    """
+    Parse a recipe YAML file, reusing its JSON sidecar cache when fresh.
+
+    The sidecar ('<recipe>.yaml.cache.json') holds the raw parsed document
+    together with the YAML's mtime and size at parse time, and is only trusted
+    while both still match exactly. Any edit invalidates it, including ones
+    that restore an older mtime (cp -p, rsync -a, tar, git stash pop). JSON
+    loads much faster than YAML, which keeps --list and repeated runs cheap.
+
+    If the cache can't be written (read-only directory, values JSON can't
+    represent), the recipe is simply parsed without caching.
+
+    Args:
+        recipe_path: Resolved path to an existing recipe file
+
+    Returns:
+        Raw parsed YAML document (validation is done by load_recipe)
+    """
+    cache_path = _recipe_cache_path(recipe_path)
+    st = recipe_path.stat()
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return cached["recipe"]
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing, corrupt or old-format cache - fall through to a fresh parse
+        pass
+
+    # Hand raw bytes to the loader: LibYAML decodes UTF-8 itself, skipping
+    # Python's text I/O layer
+    yaml, loader = _yaml_loader()
+    recipe = yaml.load(recipe_path.read_bytes(), Loader=loader)
+
+    import tempfile
+
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp"
+        )
+        with os.fdopen(fd, "w") as f:
+            json.dump({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "recipe": recipe}, f)
+        os.replace(temp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    return recipe
+
+
+@functools.lru_cache(maxsize=1)
+def _recipes_dir_entries() -> frozenset[str]:
+    """Return the file names in RECIPES_DIR, read once per process."""
+    try:
+        return frozenset(os.listdir(RECIPES_DIR))
+    except OSError:
+        return frozenset()
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_recipe_path(name: str) -> Path | None:
+    """
+    Find a recipe by name in RECIPES_DIR.
+    
+    Tries the name as-is, then with .yaml and .yml, then its stem with .yaml.
+    Candidates are checked against one cached directory listing rather than
+    with a stat() each. Call _recipes_dir_entries.cache_clear() and
+    _resolve_recipe_path.cache_clear() if the directory changes.
+    
+    Args:
+        name: Recipe file name or bare recipe name
+        
+    Returns:
+        Path to the matching recipe, or None if nothing matches
+    """
+    entries = _recipes_dir_entries()
+    for candidate in (name, f"{name}.yaml", f"{name}.yml", f"{Path(name).stem}.yaml"):
+        if candidate in entries:
+            return RECIPES_DIR / candidate
+    return None
+
+
+def _find_missing_mods(mods: list[str]) -> list[str]:
+    """
+    Return the mods that don't exist under SCRIPT_DIR.
+    
+    Each distinct parent directory (usually just mods/) is listed once and
+    mod names are checked against that, instead of a stat() per mod.
+    
+    Args:
+        mods: Mod paths relative to SCRIPT_DIR, as written in the recipe
+        
+    Returns:
+        The entries of mods whose path was not found, in recipe order
+    """
+    listings: dict[Path, frozenset[str]] = {}
+    missing = []
+    for mod in mods:
+        mod_path = SCRIPT_DIR / mod
+        if mod_path.name in ("", ".."):
+            # Not a directory entry name; ask the filesystem directly
+            if not mod_path.exists():
+                missing.append(mod)
+            continue
+        names = listings.get(mod_path.parent)
+        if names is None:
+            try:
+                names = frozenset(os.listdir(mod_path.parent))
+            except OSError:
+                names = frozenset()
+            listings[mod_path.parent] = names
+        if mod_path.name not in names:
+            missing.append(mod)
+    return missing
+
+
+def load_recipe(recipe_path: Path) -> Mapping[str, Any]:
     """
     Load and validate a recipe YAML file.
     
@@ -115,10 +314,17 @@ def load_recipe(recipe_path: Path) -> dict[str, Any]:
     required fields. Recipes are the core configuration format for deployments.
     
     EXTENSIBILITY:
-    - To add new required fields: Add to the 'required' list below
-    - To add new optional fields with defaults: Add to the setdefault() calls at the end
+    - To add new required fields: Add to the 'required' list in _load_recipe_cached()
+    - To add new optional fields with defaults: Add to the setdefault() calls there
     - Recipe search order: exact path -> recipes/ dir -> with .yaml -> with .yml
     
+    CACHING:
+        Parsed recipes are memoized per process, keyed by (resolved path, mtime,
+        size), so editing a recipe invalidates its entry automatically, even
+        within the filesystem's mtime granularity. The returned
+        mapping is read-only because it is shared between callers; use
+        dict(recipe) when a mutable copy is needed.
+    
     RECIPE SCHEMA:
         name (str, required): Human-readable name for the recipe
         recipe_version (str, required): Schema version for compatibility checking.
@@ -139,37 +345,58 @@ def load_recipe(recipe_path: Path) -> dict[str, Any]:
         recipe_path: Path object pointing to YAML file or just recipe name
         
     Returns:
-        Validated recipe dictionary with all fields populated (defaults applied)
+        Validated, read-only recipe mapping with all fields populated (defaults applied)
         
     Raises:
         SystemExit: If recipe not found or validation fails
     """
     if not recipe_path.exists():
         # Try recipes directory with various extensions
-        candidates = [
-            RECIPES_DIR / recipe_path.name,
-            RECIPES_DIR / f"{recipe_path.name}.yaml",
-            RECIPES_DIR / f"{recipe_path.name}.yml",
-            RECIPES_DIR / f"{recipe_path.stem}.yaml",
-        ]
-        for candidate in candidates:
-            if candidate.exists():
-                recipe_path = candidate
-                break
-        else:
+        resolved = _resolve_recipe_path(recipe_path.name)
+        if resolved is None:
             print(f"Error: Recipe not found: {recipe_path}")
             print(f"Searched in: {recipe_path}, {RECIPES_DIR}")
             sys.exit(1)
+        recipe_path = resolved
     
-    with open(recipe_path) as f:
-        recipe = yaml.safe_load(f)
+    st = recipe_path.stat()
+    try:
+        recipe = _load_recipe_cached(str(recipe_path.resolve()), st.st_mtime_ns, st.st_size)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if recipe["_version_warning"]:
+        print(recipe["_version_warning"])
+    return recipe
+
+
+@functools.lru_cache(maxsize=256)
+def _load_recipe_cached(path_str: str, mtime_ns: int, size: int) -> Mapping[str, Any]:
+    """
+    Parse, validate and apply defaults to a recipe file.
     
+    Memoized on (path, mtime, size) so a recipe is processed at most once
+    per process until the file changes. The size catches rewrites that land
+    within the filesystem's mtime granularity. See load_recipe() for the schema.
+    
+    Args:
+        path_str: Resolved recipe path as a string
+        mtime_ns: Recipe mtime, only used as part of the cache key
+        size: Recipe size in bytes, only used as part of the cache key
+        
+    Returns:
+        Read-only view of the validated recipe
+        
+    Raises:
+        ValueError: If a required field is missing (load_recipe reports it)
+    """
+    recipe = _read_recipe_file(Path(path_str))
+
     # Validate required fields
     required = ["name", "recipe_version", "container", "command"]
     for field in required:
         if field not in recipe:
-            print(f"Error: Recipe missing required field: {field}")
-            sys.exit(1)
+            raise ValueError(f"Recipe missing required field: {field}")
     
     # Set defaults for optional fields
     recipe.setdefault("description", "")
@@ -180,16 +407,38 @@ def load_recipe(recipe_path: Path) -> dict[str, Any]:
     recipe.setdefault("cluster_only", False)
     recipe.setdefault("solo_only", False)
     
+    # Precompute per-recipe render inputs once per recipe load
+    recipe["_solo_command"] = _strip_distributed_backend(recipe["command"])
+    recipe["_defaults_frozen"] = types.MappingProxyType(dict(recipe["defaults"] or {}))
+    mods = recipe["mods"] or []
+    recipe["_mod_paths"] = tuple(str(SCRIPT_DIR / mod) for mod in mods)
+    recipe["_missing_mod_paths"] = frozenset(str(SCRIPT_DIR / mod) for mod in _find_missing_mods(mods))
+    
     # Validate recipe version compatibility
     # EXTENSIBILITY: When adding new schema versions, update SUPPORTED_VERSIONS
     # and add migration/compatibility logic below
     SUPPORTED_VERSIONS = ["1"]
+    # The warning is kept with the recipe and printed by the caller, so --list
+    # can show it next to the right entry and every load_recipe() repeats it
     recipe_ver = str(recipe["recipe_version"])
+    recipe["_version_warning"] = None
     if recipe_ver not in SUPPORTED_VERSIONS:
-        print(f"Warning: Recipe uses schema version '{recipe_ver}', but this run-recipe.py supports: {SUPPORTED_VERSIONS}")
-        print("Some features may not work correctly. Consider updating run-recipe.py.")
+        recipe["_version_warning"] = (
+            f"Warning: Recipe uses schema version '{recipe_ver}', but this run-recipe.py supports: {SUPPORTED_VERSIONS}\n"
+            "Some features may not work correctly. Consider updating run-recipe.py."
+        )
     
-    return recipe
+    return types.MappingProxyType(recipe)
+
+
+def _safe_load_for_list(recipe_path: Path) -> Mapping[str, Any] | BaseException:
+    """Load a recipe for --list, returning the exception instead of raising it."""
+    try:
+        st = recipe_path.stat()
+        return _load_recipe_cached(str(recipe_path.resolve()), st.st_mtime_ns, st.st_size)
+    except (Exception, SystemExit) as e:
+        # SystemExit too, so one broken recipe can't blank the whole listing
+        return e
 
 
 def list_recipes() -> None:
@@ -197,26 +446,39 @@ def list_recipes() -> None:
     List all available recipes with their metadata.
     
     Scans the recipes/ directory for YAML files and displays key information.
-    Used by the --list CLI option.
+    Used by the --list CLI option. Recipes are loaded concurrently on a thread
+    pool, then printed in a single pass so output order stays sorted.
     
     EXTENSIBILITY:
     - To show additional fields: Add them to the print statements in the loop
     - To support different output formats (e.g., JSON): Add a format parameter
     - Recipe directory is defined by RECIPES_DIR constant at module level
     """
-    if not RECIPES_DIR.exists():
+    try:
+        # scandir yields cached names/types from one directory read
+        with os.scandir(RECIPES_DIR) as it:
+            recipes = sorted(
+                Path(entry.path) for entry in it
+                if entry.name.endswith(".yaml") and entry.is_file()
+            )
+    except FileNotFoundError:
         print("No recipes directory found.")
         return
     
-    recipes = sorted(RECIPES_DIR.glob("*.yaml"))
     if not recipes:
         print("No recipes found in recipes/ directory.")
         return
     
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(16, len(recipes))) as executor:
+        results = list(executor.map(_safe_load_for_list, recipes))
+    
     print("Available recipes:\n")
-    for recipe_path in recipes:
+    for recipe_path, recipe in zip(recipes, results):
         try:
-            recipe = load_recipe(recipe_path)
+            if isinstance(recipe, BaseException):
+                raise recipe
             name = recipe.get("name", recipe_path.stem)
             recipe_version = recipe.get("recipe_version", "1")
             desc = recipe.get("description", "")
@@ -227,6 +489,8 @@ def list_recipes() -> None:
             cluster_only = recipe.get("cluster_only", False)
             solo_only = recipe.get("solo_only", False)
             
+            if recipe["_version_warning"]:
+                print(recipe["_version_warning"])
             print(f"  {recipe_path.name}")
             print(f"    Name: {name}")
             if desc:
@@ -243,21 +507,180 @@ def list_recipes() -> None:
             if mods:
                 print(f"    Mods: {', '.join(mods)}")
             print()
-        except Exception as e:
+        except (Exception, SystemExit) as e:
             print(f"  {recipe_path.name} (error loading: {e})")
             print()
 
 
+@contextlib.contextmanager
+def _ssh_master_ctx(hosts: list[str]) -> Iterator[None]:
+    """
+    Keep an SSH ControlMaster connection open to each host for a block.
+    
+    Masters are started concurrently (ssh -Nf) on SSH_CONTROL_PATH, so later
+    ssh/scp/rsync calls to the same hosts reuse the authenticated connection.
+    While the block runs, SSH_OPTIONS is exported so build-and-copy.sh and
+    hf-download.sh use the same control socket. Hosts that can't be reached
+    are skipped silently; their commands just fall back to a normal connection.
+    
+    A host that still has a live master (an overlapping run, or an earlier
+    one's ControlPersist) reuses it; only masters started here are closed
+    when the block exits.
+    
+    Args:
+        hosts: Remote hostnames/IPs to connect to (may be empty)
+    """
+    if not hosts:
+        yield
+        return
+    
+    import subprocess
+
+    control = ["-o", f"ControlPath={SSH_CONTROL_PATH}"]
+    quiet = dict(stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    checks = {
+        host: subprocess.Popen(["ssh", "-O", "check", *control, host], **quiet)
+        for host in hosts
+    }
+    owned = [host for host, check in checks.items() if check.wait() != 0]
+    # ControlMaster=auto rather than -M: with -M, a socket that is still in
+    # place makes ssh fall back to a plain -Nf session that never exits,
+    # while auto unlinks a stale one and takes it over
+    masters = [
+        subprocess.Popen(
+            ["ssh", "-Nf", *control, "-o", "ControlMaster=auto",
+             "-o", "ControlPersist=600s",
+             "-o", "BatchMode=yes", "-o", "StrictHostKeyChecking=no",
+             "-o", "ConnectTimeout=10", host],
+            **quiet
+        )
+        for host in owned
+    ]
+    for master in masters:
+        master.wait()
+    
+    previous = os.environ.get("SSH_OPTIONS")
+    os.environ["SSH_OPTIONS"] = " ".join(control)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("SSH_OPTIONS", None)
+        else:
+            os.environ["SSH_OPTIONS"] = previous
+        for host in owned:
+            subprocess.run(["ssh", "-O", "exit", *control, host], capture_output=True)
+
+
+# How long a remote host's image list is trusted before it is listed again
+REMOTE_IMAGES_TTL_S = 60
+
+# Upper bound on concurrent per-node probes (each one is an ssh process)
+MAX_PROBE_WORKERS = 32
+
+# Image IDs as accepted by docker: full 'sha256:<hex>' or a (short) hex prefix
+_IMAGE_ID_RE = re.compile(r"(sha256:)?[0-9a-f]{12,64}")
+
+# Format for 'docker images' so each line is a 'repository:tag' reference
+_DOCKER_IMAGES_FORMAT = "{{.Repository}}:{{.Tag}}"
+
+# host -> (time listed, image references)
+_remote_images_cache: dict[str, tuple[float, frozenset[str]]] = {}
+
+
+def _parse_docker_images(output: str) -> frozenset[str]:
+    """Parse 'docker images' output into a set of references, dropping untagged ones."""
+    return frozenset(ref for ref in output.split() if "<none>" not in ref)
+
+
+def _normalize_image_ref(image: str) -> str | None:
+    """
+    Rewrite a 'name[:tag]' reference the way 'docker images' lists it.
+    
+    Drops the implicit 'docker.io/' and 'library/' prefixes and adds the
+    implicit ':latest' tag. Returns None for anything the listing can't
+    answer (digests, full or short image IDs); check those with
+    'docker image inspect' instead.
+    """
+    if "@" in image or _IMAGE_ID_RE.fullmatch(image):
+        return None
+    image = image.removeprefix("docker.io/").removeprefix("library/")
+    return image if ":" in image.rsplit("/", 1)[-1] else f"{image}:latest"
+
+
+@functools.lru_cache(maxsize=1)
+def _local_docker_images() -> frozenset[str]:
+    """
+    List local Docker image references with a single 'docker images' call.
+    
+    Cached for the life of the process; build_image() clears it.
+    
+    Returns:
+        'repository:tag' references, empty if docker is unavailable
+    """
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["docker", "images", "--format", _DOCKER_IMAGES_FORMAT],
+            capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+    return _parse_docker_images(result.stdout)
+
+
+def _remote_docker_images(host: str) -> frozenset[str]:
+    """
+    List a remote host's Docker image references with a single SSH call.
+    
+    Results are reused for REMOTE_IMAGES_TTL_S seconds. Failed listings are
+    not cached, so an unreachable host is retried on the next check.
+    
+    Args:
+        host: Remote hostname/IP
+        
+    Returns:
+        'repository:tag' references, empty if the host couldn't be queried
+    """
+    cached = _remote_images_cache.get(host)
+    if cached and time.monotonic() - cached[0] < REMOTE_IMAGES_TTL_S:
+        return cached[1]
+    
+    import subprocess
+
+    result = subprocess.run(
+        ["ssh", *SSH_OPTIONS, host,
+         f"docker images --format {shlex.quote(_DOCKER_IMAGES_FORMAT)}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return frozenset()
+    images = _parse_docker_images(result.stdout)
+    _remote_images_cache[host] = (time.monotonic(), images)
+    return images
+
+
+def _invalidate_image_caches() -> None:
+    """Forget cached image listings, e.g. after building or copying an image."""
+    _local_docker_images.cache_clear()
+    _remote_images_cache.clear()
+
+
 def check_image_exists(image: str, host: str | None = None) -> bool:
     """
     Check if a Docker image exists locally or on a remote host.
     
     Used to avoid redundant builds and to verify cluster nodes have the image.
+    Tag references are looked up in a cached 'docker images' listing (one
+    call per host) rather than running 'docker image inspect' each time.
+    Digest references (name@sha256:...) and image IDs are still inspected
+    directly.
     
     EXTENSIBILITY:
     - To support other container runtimes (podman): Modify the docker command
     - To add image version/digest checking: Parse 'docker image inspect' JSON output
-    - For custom SSH options: Modify the ssh command array
+    - For custom SSH options: Modify SSH_OPTIONS at module level
     
     Args:
         image: Docker image tag to check (e.g., 'vllm-node-mxfp4')
@@ -266,10 +689,15 @@ def check_image_exists(image: str, host: str | None = None) -> bool:
     Returns:
         True if image exists, False otherwise
     """
+    ref = _normalize_image_ref(image)
+    if ref is not None:
+        return ref in (_remote_docker_images(host) if host else _local_docker_images())
+    
+    import subprocess
+
     if host:
         result = subprocess.run(
-            ["ssh", "-o", "BatchMode=yes", "-o", "StrictHostKeyChecking=no", 
-             host, f"docker image inspect '{image}'"],
+            ["ssh", *SSH_OPTIONS, host, f"docker image inspect {shlex.quote(image)}"],
             capture_output=True
         )
     else:
@@ -280,12 +708,109 @@ def check_image_exists(image: str, host: str | None = None) -> bool:
     return result.returncode == 0
 
 
-def build_image(image: str, copy_to: list[str] | None = None, build_args: list[str] | None = None) -> bool:
+def check_image_exists_many(image: str, hosts: list[str]) -> dict[str, bool]:
+    """
+    Check whether a Docker image exists on several remote hosts at once.
+    
+    Probes hosts concurrently (up to MAX_PROBE_WORKERS at a time), so total
+    latency is roughly one SSH round trip instead of one per host. The result
+    keeps the order of hosts.
+    
+    Args:
+        image: Docker image tag to check
+        hosts: Remote hostnames/IPs to probe
+        
+    Returns:
+        Mapping of host -> True if the image exists there
+    """
+    if not hosts:
+        return {}
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(MAX_PROBE_WORKERS, len(hosts))) as executor:
+        results = executor.map(lambda host: check_image_exists(image, host), hosts)
+        return dict(zip(hosts, results))
+
+
+# Tagged commands started by _run_command, by output prefix, and prefixes
+# that _stop_command has cancelled (possibly before they started)
+_tagged_procs: dict[str, Any] = {}
+_stopped_prefixes: set[str] = set()
+# _thread is loaded at interpreter startup; threading would be a fresh import
+_tagged_lock = _thread.allocate_lock()
+
+
+def _run_command(cmd: list[str], output_prefix: str | None = None) -> int:
+    """
+    Run a command to completion and return its exit code.
+    
+    With output_prefix, stdout and stderr are merged and every line is
+    printed as '[prefix] line', so the output of commands running at the
+    same time (see --setup) can be told apart. Such a command runs in its
+    own process group so _stop_command() (or Ctrl-C here) can stop it along
+    with everything it started.
+    
+    Args:
+        cmd: Command and arguments
+        output_prefix: Tag for each output line, or None to inherit stdio
+        
+    Returns:
+        The command's exit code (negative if killed by a signal)
+    """
+    import signal
+    import subprocess
+
+    if output_prefix is None:
+        return subprocess.run(cmd).returncode
+    
+    with _tagged_lock:
+        if output_prefix in _stopped_prefixes:
+            _stopped_prefixes.discard(output_prefix)
+            return -signal.SIGTERM
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, errors="replace",
+                                start_new_session=True)
+        _tagged_procs[output_prefix] = proc
+    try:
+        for line in proc.stdout:
+            # One write per line so lines from concurrent commands don't mix
+            sys.stdout.write(f"[{output_prefix}] {line.rstrip(chr(10))}\n")
+            sys.stdout.flush()
+        return proc.wait()
+    except BaseException:
+        # Ctrl-C doesn't reach the command's own session; stop it here
+        _stop_command(output_prefix)
+        proc.wait()
+        raise
+    finally:
+        proc.stdout.close()
+        with _tagged_lock:
+            _tagged_procs.pop(output_prefix, None)
+            _stopped_prefixes.discard(output_prefix)
+
+
+def _stop_command(output_prefix: str) -> None:
+    """Terminate the tagged command started by _run_command, or keep it from starting."""
+    import signal
+
+    with _tagged_lock:
+        _stopped_prefixes.add(output_prefix)
+        proc = _tagged_procs.get(output_prefix)
+        if proc is not None and proc.poll() is None:
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def build_image(image: str, copy_to: list[str] | None = None, build_args: list[str] | None = None,
+                output_prefix: str | None = None) -> bool:
     """
     Build the container image using build-and-copy.sh.
     
     Delegates to the build-and-copy.sh script which handles multi-stage builds,
-    cache optimization, and distribution to worker nodes.
+    cache optimization, and distribution to worker nodes. When copying to more
+    than one worker, the copies run in parallel (--copy-parallel).
     
     EXTENSIBILITY:
     - To add new build options: Add them to build_args in the recipe's build_args field
@@ -302,12 +827,15 @@ def build_image(image: str, copy_to: list[str] | None = None, build_args: list[s
         image: Target image tag
         copy_to: List of worker hostnames to copy image to after build
         build_args: Extra arguments passed to build-and-copy.sh
+        output_prefix: Tag the script's output lines with this (see _run_command)
         
     Returns:
         True if build (and copy) succeeded, False otherwise
     """
+    # Same tag as the script's output lines (see _run_command)
+    tag = f"[{output_prefix}] " if output_prefix else ""
     if not BUILD_SCRIPT.exists():
-        print(f"Error: Build script not found: {BUILD_SCRIPT}")
+        print(f"{tag}Error: Build script not found: {BUILD_SCRIPT}")
         return False
     
     cmd = [str(BUILD_SCRIPT), "-t", image]
@@ -315,23 +843,29 @@ def build_image(image: str, copy_to: list[str] | None = None, build_args: list[s
         cmd.extend(build_args)
     if copy_to:
         cmd.extend(["--copy-to", ",".join(copy_to)])
+        if len(copy_to) > 1:
+            # Copy to all workers concurrently instead of one host at a time
+            cmd.append("--copy-parallel")
     
-    print(f"Building image '{image}'...")
+    print(f"{tag}Building image '{image}'...")
     if build_args:
-        print(f"Build args: {' '.join(build_args)}")
+        print(f"{tag}Build args: {' '.join(build_args)}")
     if copy_to:
-        print(f"Will copy to: {', '.join(copy_to)}")
+        print(f"{tag}Will copy to: {', '.join(copy_to)}")
     
-    result = subprocess.run(cmd)
-    return result.returncode == 0
+    returncode = _run_command(cmd, output_prefix)
+    # The image set here and on the workers has changed
+    _invalidate_image_caches()
+    return returncode == 0
 
 
-def download_model(model: str, copy_to: list[str] | None = None) -> bool:
+def download_model(model: str, copy_to: list[str] | None = None, output_prefix: str | None = None) -> bool:
     """
     Download model from HuggingFace using hf-download.sh.
     
     Delegates to hf-download.sh which handles HF authentication, caching,
-    and rsync to worker nodes.
+    and rsync to worker nodes. When copying to more than one worker, the
+    rsyncs run in parallel (--copy-parallel).
     
     EXTENSIBILITY:
     - To support other model sources: Create a new download script and switch based on model URL
@@ -342,31 +876,39 @@ def download_model(model: str, copy_to: list[str] | None = None) -> bool:
     Args:
         model: HuggingFace model ID (e.g., 'Salyut1/GLM-4.7-NVFP4')
         copy_to: List of worker hostnames to copy model cache to
+        output_prefix: Tag the script's output lines with this (see _run_command)
         
     Returns:
         True if download (and copy) succeeded, False otherwise
     """
+    # Tagged like the script's own output, which may be interleaved with another's
+    tag = f"[{output_prefix}] " if output_prefix else ""
     if not DOWNLOAD_SCRIPT.exists():
-        print(f"Error: Download script not found: {DOWNLOAD_SCRIPT}")
+        print(f"{tag}Error: Download script not found: {DOWNLOAD_SCRIPT}")
         return False
     
     cmd = [str(DOWNLOAD_SCRIPT), model]
     if copy_to:
         cmd.extend(["--copy-to", ",".join(copy_to)])
+        if len(copy_to) > 1:
+            # Copy to all workers concurrently instead of one host at a time
+            cmd.append("--copy-parallel")
     
-    print(f"Downloading model '{model}'...")
+    print(f"{tag}Downloading model '{model}'...")
     if copy_to:
-        print(f"Will copy to: {', '.join(copy_to)}")
+        print(f"{tag}Will copy to: {', '.join(copy_to)}")
     
-    result = subprocess.run(cmd)
-    return result.returncode == 0
+    return _run_command(cmd, output_prefix) == 0
 
 
+@functools.lru_cache(maxsize=128)
 def check_model_exists(model: str) -> bool:
     """
     Check if a model exists in the HuggingFace cache.
     
-    Checks the standard HF cache location for completed downloads.
+    Checks the standard HF cache location for completed downloads. Results are
+    memoized per model; call check_model_exists.cache_clear() after a download
+    so the next check sees the new snapshot.
     
     EXTENSIBILITY:
     - To support custom cache locations: Add HF_HOME env var support
@@ -384,15 +926,46 @@ def check_model_exists(model: str) -> bool:
     cache_name = f"models--{model.replace('/', '--')}"
     cache_path = Path.home() / ".cache" / "huggingface" / "hub" / cache_name
     
-    if cache_path.exists():
-        # Check for snapshots directory which indicates complete download
-        snapshots = cache_path / "snapshots"
-        if snapshots.exists() and any(snapshots.iterdir()):
-            return True
-    return False
+    # A non-empty snapshots directory indicates a complete download.
+    # scandir stops after the first entry instead of listing them all.
+    try:
+        with os.scandir(cache_path / "snapshots") as it:
+            return next(it, None) is not None
+    except OSError:
+        return False
+
+
+@functools.lru_cache(maxsize=64)
+def _template_fields(command: str) -> frozenset[str]:
+    """
+    Return the placeholder names referenced by a command template.
+    
+    Cached so each template is only scanned once, however many variants of
+    it are rendered.
+    """
+    fields = set()
+    for _, field_name, _, _ in string.Formatter().parse(command):
+        if field_name:
+            # '{a.b}' and '{a[0]}' both look up 'a'
+            fields.add(field_name.partition(".")[0].partition("[")[0])
+    return frozenset(fields)
+
+
+# Matches a whole line (and its newline) mentioning the distributed executor
+_SOLO_STRIP_RE = re.compile(r'^[^\n]*--distributed-executor-backend[^\n]*\n?', re.M)
+
+
+def _strip_distributed_backend(command: str) -> str:
+    """
+    Remove every line containing --distributed-executor-backend.
+    
+    Used for solo mode. Drops whole lines in a single regex pass so
+    multi-line commands with backslash continuations keep their shape.
+    """
+    return _SOLO_STRIP_RE.sub('', command)
 
 
-def generate_launch_script(recipe: dict[str, Any], overrides: dict[str, Any], is_solo: bool = False, extra_args: list[str] | None = None) -> str:
+def generate_launch_script(recipe: Mapping[str, Any], overrides: dict[str, Any], is_solo: bool = False, extra_args: list[str] | None = None) -> str:
     """
     Generate a bash launch script from the recipe.
     
@@ -434,8 +1007,11 @@ def generate_launch_script(recipe: dict[str, Any], overrides: dict[str, Any], is
     Raises:
         SystemExit: If required template variables are missing
     """
-    # Merge defaults with overrides
-    params = {**recipe.get("defaults", {}), **overrides}
+    # Layer overrides over the recipe defaults without copying either
+    defaults = recipe.get("_defaults_frozen")
+    if defaults is None:
+        defaults = recipe.get("defaults") or {}
+    params = collections.ChainMap(overrides, defaults)
     
     # Build the script
     lines = ["#!/bin/bash", f"# Generated from recipe: {recipe['name']}", ""]
@@ -448,28 +1024,31 @@ def generate_launch_script(recipe: dict[str, Any], overrides: dict[str, Any], is
             lines.append(f"export {key}=\"{value}\"")
         lines.append("")
     
+    # In solo mode, remove --distributed-executor-backend ray
+    # (it's not needed and can cause issues on single node).
+    # load_recipe() precomputes the stripped template.
+    if is_solo:
+        command = recipe.get("_solo_command")
+        if command is None:
+            command = _strip_distributed_backend(recipe["command"])
+    else:
+        command = recipe["command"]
+    
     # Format the command with parameters
-    command = recipe["command"]
+    missing = _template_fields(command) - params.keys()
+    if missing:
+        print(f"Error: Missing parameter in recipe command: {', '.join(repr(m) for m in sorted(missing))}")
+        print(f"Available parameters: {list(params.keys())}")
+        sys.exit(1)
     try:
         command = command.format(**params)
     except KeyError as e:
+        # Backstop for fields _template_fields can't see, e.g. nested
+        # format specs like {port:{width}}
         print(f"Error: Missing parameter in recipe command: {e}")
         print(f"Available parameters: {list(params.keys())}")
         sys.exit(1)
     
-    # In solo mode, remove --distributed-executor-backend ray
-    # (it's not needed and can cause issues on single node)
-    if is_solo:
-        import re
-        # Remove the entire line containing --distributed-executor-backend
-        # This handles multi-line commands with backslash continuations
-        lines_list = command.split('\n')
-        filtered_lines = [
-            line for line in lines_list 
-            if '--distributed-executor-backend' not in line
-        ]
-        command = '\n'.join(filtered_lines)
-    
     # Append extra args if provided (after --)
     if extra_args:
         # Join extra args and append to command
@@ -524,6 +1103,20 @@ def get_worker_nodes(nodes: list[str]) -> list[str]:
     return nodes[1:]
 
 
+# One KEY=value assignment per line; the value may be "double" (with \" and
+# \\ escapes) or 'single' quoted. As in bash, '#' only starts a comment
+# after whitespace, so an unquoted a#b stays a#b
+_ENV_LINE_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"((?:[^"\\\n]|\\.)*)"|'([^'\n]*)'|([^\n]*?))(?:[ \t]+#[^\n]*|[ \t\r]*)$""",
+    re.M,
+)
+_ENV_ESCAPE_RE = re.compile(r'\\([\\"])')
+
+# Values containing any of these are written double-quoted by save_env_file()
+_ENV_QUOTE_CHARS = (" ", ",", "#", '"')
+
+
 def load_env_file() -> dict[str, str]:
     """
     Load environment variables from .env file.
@@ -544,17 +1137,20 @@ def load_env_file() -> dict[str, str]:
     Returns:
         Dictionary of key=value pairs from .env file
     """
-    env = {}
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    # Remove quotes if present
-                    value = value.strip().strip('"').strip("'")
-                    env[key.strip()] = value
-    return env
+    try:
+        text = ENV_FILE.read_text()
+    except FileNotFoundError:
+        return {}
+    # Quotes are stripped, as are trailing '# comments' on unquoted values
+    return {
+        m[1]: _ENV_ESCAPE_RE.sub(r"\1", m[2]) if m[2] else (m[3] or m[4] or "")
+        for m in _ENV_LINE_RE.finditer(text)
+    }
+
+
+def _format_env(env: Mapping[str, str]) -> str:
+    """Render env as indented KEY=value lines, sorted by key, for display."""
+    return "".join(f"  {key}={value}\n" for key, value in sorted(env.items()))
 
 
 def save_env_file(env: dict[str, str]) -> None:
@@ -562,7 +1158,8 @@ def save_env_file(env: dict[str, str]) -> None:
     Save environment variables to .env file.
     
     Persists cluster configuration discovered by autodiscover.sh.
-    Values are properly quoted if they contain spaces or commas.
+    Values containing spaces, commas, '#' or quotes are double-quoted, with
+    backslashes and double quotes escaped so load_env_file() reads them back.
     
     EXTENSIBILITY:
     - To add new persistent settings: Just add them to the env dict before calling
@@ -572,28 +1169,119 @@ def save_env_file(env: dict[str, str]) -> None:
     Args:
         env: Dictionary of key=value pairs to save
     """
-    lines = ["# Auto-generated by run-recipe.py --discover", ""]
-    for key, value in sorted(env.items()):
-        # Quote values with spaces
-        if " " in value or "," in value:
-            lines.append(f'{key}="{value}"')
-        else:
-            lines.append(f"{key}={value}")
-    lines.append("")
-    
-    with open(ENV_FILE, "w") as f:
-        f.write("\n".join(lines))
+    with open(ENV_FILE, "w", buffering=1 << 16) as f:
+        f.write("# Auto-generated by run-recipe.py --discover\n\n")
+        for key, value in sorted(env.items()):
+            if any(c in value for c in _ENV_QUOTE_CHARS):
+                escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+                f.write(f'{key}="{escaped}"\n')
+            else:
+                f.write(f"{key}={value}\n")
     
     print(f"Saved to {ENV_FILE}")
 
 
-def run_autodiscover() -> dict[str, str] | None:
+def prompt(message: str, default: str, timeout: float = PROMPT_TIMEOUT_S) -> str:
+    """
+    Ask a yes/no style question without ever blocking indefinitely.
+    
+    The answer is read from stdin if it is a terminal and someone replies
+    within timeout seconds; otherwise default is used. With
+    SPARK_VLLM_ASSUME_YES=1 in the environment every prompt answers 'y',
+    like apt-get -y.
+    
+    Args:
+        message: Prompt text, printed without a trailing newline
+        default: Answer used on timeout, EOF or non-interactive stdin
+        timeout: Seconds to wait for a reply
+        
+    Returns:
+        The stripped, lowercased reply ('' if the user just pressed Enter)
+    """
+    if os.environ.get("SPARK_VLLM_ASSUME_YES") == "1":
+        print(f"{message}y")
+        return "y"
+    if not sys.stdin.isatty():
+        print(f"{message}{default} (non-interactive)")
+        return default
+    
+    import select
+
+    print(message, end="", flush=True)
+    ready, _, _ = select.select([sys.stdin], [], [], timeout)
+    if not ready:
+        print(f"{default} (no reply in {int(timeout)}s)")
+        return default
+    line = sys.stdin.readline()
+    if not line:
+        print()
+        return default
+    return line.strip().lower()
+
+
+def _env_file_age() -> float | None:
+    """Return seconds since .env was last written, or None if it doesn't exist."""
+    try:
+        return time.time() - ENV_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def _env_is_fresh(force: bool) -> bool:
+    """Return True if .env is younger than AUTODISCOVER_TTL_S and force is off."""
+    if force:
+        return False
+    age = _env_file_age()
+    return age is not None and age < AUTODISCOVER_TTL_S
+
+
+def _spawn_autodiscover() -> Any:
+    """
+    Start the autodiscover.sh scan in the background.
+    
+    The scan prints the detected variables as its last lines; pass the
+    returned process to run_autodiscover() to collect them.
+    
+    Returns:
+        The running subprocess.Popen, with stdout and stderr piped as text
+    """
+    # Run autodiscover in a subshell and capture the variables
+    # We source the script and print the variables we care about
+    script = f"""
+        source '{AUTODISCOVER_SCRIPT}'
+        detect_interfaces
+        detect_local_ip
+        detect_nodes
+        echo "CLUSTER_NODES=$NODES_ARG"
+        echo "LOCAL_IP=$LOCAL_IP"
+        echo "ETH_IF=$ETH_IF"
+        echo "IB_IF=$IB_IF"
+    """
+    
+    import subprocess
+
+    return subprocess.Popen(
+        ["bash", "-c", script],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+
+
+def run_autodiscover(force: bool = False, scan: Any = None) -> dict[str, str] | None:
     """
     Run autodiscover.sh and return discovered configuration.
     
     Executes the autodiscover.sh script to detect cluster topology,
     then presents an interactive node selection menu.
     
+    Network scans are slow, so if .env was written less than
+    AUTODISCOVER_TTL_S seconds ago its contents are returned instead,
+    unless force is set (--force-discover).
+    
+    The scan itself can be started early with _spawn_autodiscover() so it
+    overlaps other work; this then only waits for it and does the rest.
+    
     EXTENSIBILITY:
     - To add new discovery methods: Extend autodiscover.sh or add Python detection here
     - To add GPU detection: Add nvidia-smi parsing to discovered env
@@ -606,45 +1294,41 @@ def run_autodiscover() -> dict[str, str] | None:
         ETH_IF: Ethernet interface name (e.g., 'eth0')
         IB_IF: InfiniBand interface name (e.g., 'ibp12s0') if available
     
+    Args:
+        force: Always run discovery, even if .env is fresh
+        scan: Scan already started by _spawn_autodiscover(), if any
+    
     Returns:
         Dictionary with discovered configuration, or None if discovery failed
     """
-    if not AUTODISCOVER_SCRIPT.exists():
-        print(f"Error: Autodiscover script not found: {AUTODISCOVER_SCRIPT}")
-        return None
+    if scan is None:
+        if _env_is_fresh(force):
+            print(f"Using configuration from {ENV_FILE} ({int(_env_file_age() or 0)}s old).")
+            print("Run with --force-discover to scan the network again.")
+            print()
+            return load_env_file()
+        
+        if not AUTODISCOVER_SCRIPT.exists():
+            print(f"Error: Autodiscover script not found: {AUTODISCOVER_SCRIPT}")
+            return None
+        
+        scan = _spawn_autodiscover()
     
     print("Running autodiscover...")
     print()
     
-    # Run autodiscover in a subshell and capture the variables
-    # We source the script and print the variables we care about
-    script = f"""
-        source '{AUTODISCOVER_SCRIPT}'
-        detect_interfaces
-        detect_local_ip
-        detect_nodes
-        echo "CLUSTER_NODES=$NODES_ARG"
-        echo "LOCAL_IP=$LOCAL_IP"
-        echo "ETH_IF=$ETH_IF"
-        echo "IB_IF=$IB_IF"
-    """
-    
-    result = subprocess.run(
-        ["bash", "-c", script],
-        capture_output=True,
-        text=True
-    )
+    stdout, stderr = scan.communicate()
     
-    if result.returncode != 0:
+    if scan.returncode != 0:
         print("Autodiscover output:")
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+        print(stdout)
+        if stderr:
+            print(stderr)
         print("Error: Autodiscover failed")
         return None
     
     # Print the autodiscover output (excluding the final variable lines)
-    output_lines = result.stdout.strip().split("\n")
+    output_lines = stdout.strip().split("\n")
     env = {}
     for line in output_lines:
         if "=" in line and any(line.startswith(k) for k in ["CLUSTER_NODES=", "LOCAL_IP=", "ETH_IF=", "IB_IF="]):
@@ -671,7 +1355,7 @@ def run_autodiscover() -> dict[str, str] | None:
                 
                 # Default to yes for all nodes
                 while True:
-                    response = input(f"  Include {label}? [Y/n]: ").strip().lower()
+                    response = prompt(f"  Include {label}? [Y/n]: ", default="y")
                     if response in ("", "y", "yes"):
                         selected_nodes.append(node)
                         break
@@ -698,30 +1382,55 @@ def run_autodiscover() -> dict[str, str] | None:
     return env
 
 
-def main():
+def _launch_script_dir() -> str:
+    """Return where the temporary launch script is written: SHM_DIR if writable."""
+    if os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    import tempfile
+
+    return tempfile.gettempdir()
+
+
+def _format_command(groups: list[list[str]], width: int = 76) -> str:
     """
-    Main entry point for the recipe runner.
+    Render a command for display so it can be pasted back into a shell.
     
-    Orchestrates the full deployment pipeline:
-    1. Parse CLI arguments and load recipe
-    2. Resolve cluster nodes (CLI -> .env -> autodiscover)
-    3. Build phase: Build container if missing, copy to workers
-    4. Download phase: Download model if missing, copy to workers  
-    5. Run phase: Generate launch script and execute via launch-cluster.sh
+    Each group (a flag and its value) is shell-quoted and kept on one line;
+    lines are wrapped at about width characters with backslash continuations.
     
-    EXTENSIBILITY:
-    - To add new CLI options: Add to the appropriate argument group
-    - To add new phases: Insert between existing phases with similar pattern
-    - To add pre/post hooks: Add hook execution before/after subprocess calls
-    - To add logging: Replace print() with logging module calls
-    - To add config file support: Load defaults from ~/.config/vllm-recipes.yaml
+    Args:
+        groups: Command words, grouped as they should stay together
+        width: Line length to wrap at
+        
+    Returns:
+        The quoted, possibly multi-line command
+    """
+    lines = []
+    line = ""
+    for group in groups:
+        part = shlex.join(group)
+        if line and len(line) + 1 + len(part) > width:
+            lines.append(line)
+            line = part
+        else:
+            line = f"{line} {part}" if line else part
+    lines.append(line)
+    return " \\\n      ".join(lines)
+
+
+def _build_parser(minimal: bool = False) -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
     
-    EXIT CODES:
-        0: Success
-        1: Error (recipe not found, build failed, validation error, etc.)
+    --list and --show-env on their own never touch the setup, override,
+    launch or discovery options, so with minimal set only the arguments
+    those paths read are registered (see _FAST_PATH_FLAGS).
+    
+    Args:
+        minimal: Build just the recipe, --list and --show-env arguments
         
     Returns:
-        Exit code for sys.exit()
+        Configured ArgumentParser
     """
     parser = argparse.ArgumentParser(
         description="Run a model using a YAML recipe",
@@ -769,6 +1478,11 @@ Examples:
         help="List available recipes"
     )
     
+    if minimal:
+        parser.add_argument("--show-env", action="store_true", help="Show current .env configuration")
+        parser.set_defaults(discover=False, force_discover=False)
+        return parser
+    
     # Setup options
     setup_group = parser.add_argument_group("Setup options")
     setup_group.add_argument(
@@ -796,6 +1510,11 @@ Examples:
         action="store_true",
         help="Force re-download even if model exists"
     )
+    setup_group.add_argument(
+        "--no-parallel-setup",
+        action="store_true",
+        help="With --setup, download the model after the build instead of alongside it"
+    )
     
     parser.add_argument(
         "--dry-run",
@@ -826,12 +1545,48 @@ Examples:
         action="store_true",
         help="Auto-detect cluster nodes and save to .env file"
     )
+    discover_group.add_argument(
+        "--force-discover",
+        action="store_true",
+        help=f"Like --discover, but re-scan even if .env is less than {AUTODISCOVER_TTL_S}s old"
+    )
     discover_group.add_argument(
         "--show-env",
         action="store_true", 
         help="Show current .env configuration"
     )
     
+    return parser
+
+
+def main():
+    """
+    Main entry point for the recipe runner.
+    
+    Orchestrates the full deployment pipeline:
+    1. Parse CLI arguments and load recipe
+    2. Resolve cluster nodes (CLI -> .env -> autodiscover)
+    3. Build phase: Build container if missing, copy to workers
+    4. Download phase: Download model if missing, copy to workers  
+    5. Run phase: Generate launch script and execute via launch-cluster.sh
+    
+    EXTENSIBILITY:
+    - To add new CLI options: Add to the appropriate argument group
+    - To add new phases: Insert between existing phases with similar pattern
+    - To add pre/post hooks: Add hook execution before/after subprocess calls
+    - To add logging: Replace print() with logging module calls
+    - To add config file support: Load defaults from ~/.config/vllm-recipes.yaml
+    
+    EXIT CODES:
+        0: Success
+        1: Error (recipe not found, build failed, validation error, etc.)
+        
+    Returns:
+        Exit code for sys.exit()
+    """
+    argv = sys.argv[1:]
+    parser = _build_parser(minimal=bool(argv) and set(argv) <= _FAST_PATH_FLAGS)
+    
     # Use parse_known_args to allow extra vLLM arguments after --
     args, extra_args = parser.parse_known_args()
     
@@ -840,17 +1595,16 @@ Examples:
         extra_args = extra_args[1:]
     
     # Handle --discover (can be run with or without a recipe)
-    if args.discover:
-        env = run_autodiscover()
+    if args.discover or args.force_discover:
+        env = run_autodiscover(force=args.force_discover)
         if env is None:
             return 1
         
-        print("Discovered configuration:")
-        for key, value in sorted(env.items()):
-            print(f"  {key}={value}")
-        print()
+        sys.stdout.write(f"Discovered configuration:\n{_format_env(env)}\n")
         
-        save_env_file(env)
+        # Don't rewrite an unchanged .env; that would also reset its age
+        if env != load_env_file():
+            save_env_file(env)
         
         if not args.recipe:
             return 0
@@ -859,9 +1613,7 @@ Examples:
     if args.show_env:
         env = load_env_file()
         if env:
-            print(f"Current .env configuration ({ENV_FILE}):")
-            for key, value in sorted(env.items()):
-                print(f"  {key}={value}")
+            sys.stdout.write(f"Current .env configuration ({ENV_FILE}):\n{_format_env(env)}")
         else:
             print(f"No .env file found at {ENV_FILE}")
             print("Run with --discover to auto-detect cluster nodes.")
@@ -878,9 +1630,27 @@ Examples:
         parser.print_help()
         return 1
     
+    # .env is only consulted when neither -n nor --solo settles the nodes;
+    # read it at most once
+    nodes = parse_nodes(args.nodes)
+    needs_env = not nodes and not args.solo
+    saved_env = load_env_file() if needs_env else {}
+    
+    # With no nodes on the command line or in .env, a network scan is coming
+    # up; start it now so it runs while the recipe is loaded and checked
+    pending_scan = None
+    if needs_env and AUTODISCOVER_SCRIPT.exists() and not saved_env.get("CLUSTER_NODES"):
+        if not _env_is_fresh(args.force_discover):
+            pending_scan = _spawn_autodiscover()
+    
     # Load recipe
     recipe_path = Path(args.recipe)
-    recipe = load_recipe(recipe_path)
+    try:
+        recipe = load_recipe(recipe_path)
+    except SystemExit:
+        if pending_scan is not None:
+            pending_scan.kill()
+        raise
     
     print(f"Recipe: {recipe['name']}")
     if recipe.get("description"):
@@ -892,15 +1662,13 @@ Examples:
     model = recipe.get("model")
     build_args = recipe.get("build_args", [])
     
-    # Parse nodes - check command line first, then .env file, then autodiscover
-    nodes = parse_nodes(args.nodes)
+    # Resolve nodes - command line first, then .env file, then autodiscover
     nodes_from_env = False
     
-    if not nodes and not args.solo:
-        # Try to load from .env file
-        env = load_env_file()
-        if env.get("CLUSTER_NODES"):
-            nodes = parse_nodes(env["CLUSTER_NODES"])
+    if needs_env:
+        # Try the .env file
+        if saved_env.get("CLUSTER_NODES"):
+            nodes = parse_nodes(saved_env["CLUSTER_NODES"])
             nodes_from_env = True
             if nodes:
                 print(f"Using cluster nodes from .env: {', '.join(nodes)}")
@@ -910,7 +1678,7 @@ Examples:
             print("No cluster nodes configured. Running autodiscover...")
             print()
             
-            discovered_env = run_autodiscover()
+            discovered_env = run_autodiscover(force=args.force_discover, scan=pending_scan)
             if discovered_env and discovered_env.get("CLUSTER_NODES"):
                 nodes = parse_nodes(discovered_env["CLUSTER_NODES"])
                 nodes_from_env = True
@@ -918,7 +1686,7 @@ Examples:
                 if nodes:
                     # Ask if user wants to save to .env
                     print()
-                    response = input("Save this configuration to .env for future use? [Y/n]: ").strip().lower()
+                    response = prompt("Save this configuration to .env for future use? [Y/n]: ", default="y")
                     if response in ("", "y", "yes"):
                         save_env_file(discovered_env)
                     print()
@@ -972,103 +1740,142 @@ Examples:
         print(f"Solo mode: {is_solo}")
         print()
     
-    # --- Build Phase ---
-    if args.build_only or args.setup or args.force_build:
-        if args.dry_run:
-            image_exists = check_image_exists(container)
-            if args.force_build or not image_exists:
-                print(f"Would build container: {container}")
-                if copy_targets:
-                    print(f"  Would copy to: {', '.join(copy_targets)}")
-            else:
-                print(f"Container '{container}' already exists locally.")
-                if copy_targets:
-                    print(f"  Would check/copy to workers: {', '.join(copy_targets)}")
-            print()
-        else:
-            image_exists = check_image_exists(container)
+    # Hold one SSH connection per worker open while the setup phases probe
+    # and copy to them
+    setup_phase = (args.build_only or args.setup or args.force_build
+                   or args.download_only or args.force_download)
+    ssh_hosts = copy_targets if copy_targets and setup_phase and not args.dry_run else []
+    
+    # Whether the image is present locally; probed at most once per run and
+    # shared by the build phase and the pre-run check
+    image_exists = None
+    
+    # Closing the ExitStack waits for a background download, so it always
+    # finishes before the SSH master connections are torn down
+    with _ssh_master_ctx(ssh_hosts), contextlib.ExitStack() as background:
+        # With --setup, a model download that's needed anyway runs alongside
+        # the build phase instead of after it
+        download_future = None
+        if (args.setup and model and not args.dry_run and not args.build_only
+                and not args.no_parallel_setup
+                and (args.force_download or not check_model_exists(model))):
+            from concurrent.futures import ThreadPoolExecutor
+
+            # Runs last: forget a stop that came after the download finished
+            background.callback(_stopped_prefixes.discard, "download")
+            pool = background.enter_context(ThreadPoolExecutor(max_workers=1))
+            print("=== Downloading Model (alongside build) ===")
+            download_future = pool.submit(download_model, model, copy_targets, "download")
             
-            if args.force_build or not image_exists:
-                print("=== Building Container ===")
-                if not build_image(container, copy_targets, build_args):
-                    print("Error: Failed to build container")
-                    return 1
+            # Leaving early (failed build, Ctrl-C) stops the download rather
+            # than waiting on it; runs before the pool's shutdown
+            def stop_download() -> None:
+                if not download_future.done():
+                    print("Stopping the model download...")
+                    _stop_command("download")
+            background.callback(stop_download)
+        build_prefix = "build" if download_future else None
+        
+        # --- Build Phase ---
+        if args.build_only or args.setup or args.force_build:
+            image_exists = check_image_exists(container)
+            if args.dry_run:
+                if args.force_build or not image_exists:
+                    print(f"Would build container: {container}")
+                    if copy_targets:
+                        print(f"  Would copy to: {', '.join(copy_targets)}")
+                else:
+                    print(f"Container '{container}' already exists locally.")
+                    if copy_targets:
+                        print(f"  Would check/copy to workers: {', '.join(copy_targets)}")
                 print()
             else:
-                print(f"Container '{container}' already exists locally.")
-                # Check worker nodes in cluster mode
-                if copy_targets:
-                    missing_on = []
-                    for worker in copy_targets:
-                        if not check_image_exists(container, worker):
-                            missing_on.append(worker)
-                    if missing_on:
-                        print(f"Container missing on workers: {', '.join(missing_on)}")
-                        print("Building and copying...")
-                        if not build_image(container, missing_on, build_args):
-                            print("Error: Failed to build/copy container")
-                            return 1
-                print()
+                if args.force_build or not image_exists:
+                    print("=== Building Container ===")
+                    if not build_image(container, copy_targets, build_args, build_prefix):
+                        print("Error: Failed to build container")
+                        return 1
+                    image_exists = True
+                    print()
+                else:
+                    print(f"Container '{container}' already exists locally.")
+                    # Check worker nodes in cluster mode
+                    if copy_targets:
+                        present_on = check_image_exists_many(container, copy_targets)
+                        missing_on = [w for w in copy_targets if not present_on[w]]
+                        if missing_on:
+                            print(f"Container missing on workers: {', '.join(missing_on)}")
+                            print("Building and copying...")
+                            if not build_image(container, missing_on, build_args, build_prefix):
+                                print("Error: Failed to build/copy container")
+                                return 1
+                    print()
         
-        if args.build_only:
-            print("Build complete." if not args.dry_run else "")
-            return 0
+            if args.build_only:
+                print("Build complete." if not args.dry_run else "")
+                return 0
     
-    # --- Download Phase ---
-    if model and (args.download_only or args.setup or args.force_download):
-        if args.dry_run:
-            model_exists = check_model_exists(model)
-            if args.force_download or not model_exists:
-                print(f"Would download model: {model}")
-                if copy_targets:
-                    print(f"  Would copy to: {', '.join(copy_targets)}")
-            else:
-                print(f"Model '{model}' already exists in cache.")
-            print()
-        else:
+        # --- Download Phase ---
+        if model and (args.download_only or args.setup or args.force_download):
             model_exists = check_model_exists(model)
-            
-            if args.force_download or not model_exists:
-                print("=== Downloading Model ===")
-                if not download_model(model, copy_targets):
-                    print("Error: Failed to download model")
-                    return 1
+            if args.dry_run:
+                if args.force_download or not model_exists:
+                    print(f"Would download model: {model}")
+                    if copy_targets:
+                        print(f"  Would copy to: {', '.join(copy_targets)}")
+                else:
+                    print(f"Model '{model}' already exists in cache.")
                 print()
             else:
-                print(f"Model '{model}' already exists in cache.")
-                print()
+                if download_future is not None:
+                    print("Waiting for model download to finish...")
+                    if not download_future.result():
+                        print("Error: Failed to download model")
+                        return 1
+                    check_model_exists.cache_clear()
+                    print()
+                elif args.force_download or not model_exists:
+                    print("=== Downloading Model ===")
+                    if not download_model(model, copy_targets):
+                        print("Error: Failed to download model")
+                        return 1
+                    check_model_exists.cache_clear()
+                    print()
+                else:
+                    print(f"Model '{model}' already exists in cache.")
+                    print()
         
-        if args.download_only:
-            print("Download complete." if not args.dry_run else "")
-            return 0
+            if args.download_only:
+                print("Download complete." if not args.dry_run else "")
+                return 0
     
     # --- Run Phase ---
     if args.build_only or args.download_only:
         return 0
     
     # Check if image exists (if not using --setup)
-    if not args.dry_run and not args.setup and not check_image_exists(container):
-        print(f"Container image '{container}' not found locally.")
-        print()
-        print("Options:")
-        print(f"  1. Use --setup to build and run")
-        print(f"  2. Build manually: ./build-and-copy.sh -t {container}")
-        print()
-        response = input("Build now? [y/N] ").strip().lower()
-        if response == 'y':
-            if not build_image(container, copy_targets, build_args):
-                print("Error: Failed to build image")
+    if not args.dry_run and not args.setup:
+        if image_exists is None:
+            image_exists = check_image_exists(container)
+        if not image_exists:
+            print(f"Container image '{container}' not found locally.")
+            print()
+            print("Options:")
+            print(f"  1. Use --setup to build and run")
+            print(f"  2. Build manually: ./build-and-copy.sh -t {container}")
+            print()
+            response = prompt("Build now? [y/N] ", default="n")
+            if response == 'y':
+                if not build_image(container, copy_targets, build_args):
+                    print("Error: Failed to build image")
+                    return 1
+            else:
+                print("Aborting.")
                 return 1
-        else:
-            print("Aborting.")
-            return 1
     
     # Build overrides from CLI args
-    overrides = {}
-    for key in ["port", "host", "tensor_parallel", "gpu_memory_utilization", "max_model_len"]:
-        value = getattr(args, key, None)
-        if value is not None:
-            overrides[key] = value
+    arg_values = vars(args)
+    overrides = {key: arg_values[key] for key in _OVERRIDE_KEYS if arg_values.get(key) is not None}
     
     # In solo mode, default tensor_parallel to 1 (unless user explicitly set --tp)
     if is_solo and "tensor_parallel" not in overrides:
@@ -1076,71 +1883,68 @@ Examples:
     
     # Check for duplicate arguments (warn if extra_args duplicate CLI overrides)
     if extra_args:
-        # Map vLLM flags to our override keys
-        flag_to_override = {
-            '--port': 'port',
-            '--host': 'host',
-            '--tensor-parallel-size': 'tensor_parallel',
-            '-tp': 'tensor_parallel',
-            '--gpu-memory-utilization': 'gpu_memory_utilization',
-            '--max-model-len': 'max_model_len',
-        }
-        for i, arg in enumerate(extra_args):
-            # Check both exact flag and =value syntax
-            flag = arg.split('=')[0] if '=' in arg else arg
-            if flag in flag_to_override:
-                override_key = flag_to_override[flag]
-                if override_key in overrides:
-                    print(f"Warning: '{arg}' in extra args duplicates --{override_key.replace('_', '-')} override")
-                    print(f"         vLLM uses last value; extra args appear after template substitution")
+        for arg in extra_args:
+            # Check the exact flag first; only split --flag=value syntax
+            override_key = _FLAG_TO_OVERRIDE.get(arg)
+            if override_key is None and '=' in arg:
+                override_key = _FLAG_TO_OVERRIDE.get(arg.partition('=')[0])
+            if override_key and override_key in overrides:
+                print(f"Warning: '{arg}' in extra args duplicates --{override_key.replace('_', '-')} override")
+                print(f"         vLLM uses last value; extra args appear after template substitution")
     
     # Generate launch script
     script_content = generate_launch_script(recipe, overrides, is_solo=is_solo, extra_args=extra_args)
     
     if args.dry_run:
-        print("=== Generated Launch Script ===")
-        print(script_content)
-        print("=== What would be executed ===")
-        print()
-        print("1. The above script is saved to a temporary file")
-        print()
-        print("2. launch-cluster.sh is called with:")
-        cmd_parts = ["   ./launch-cluster.sh", "-t", container]
-        for mod in recipe.get("mods", []):
-            cmd_parts.extend(["--apply-mod", mod])
+        cmd_groups = [["./launch-cluster.sh"], ["-t", container]]
+        for mod in recipe.get("mods") or []:
+            cmd_groups.append(["--apply-mod", mod])
         if args.solo:
-            cmd_parts.append("--solo")
+            cmd_groups.append(["--solo"])
         elif not is_cluster:
-            cmd_parts.append("--solo")
+            cmd_groups.append(["--solo"])
         if args.daemon:
-            cmd_parts.append("-d")
+            cmd_groups.append(["-d"])
         if nodes:
-            cmd_parts.extend(["-n", ",".join(nodes)])
+            cmd_groups.append(["-n", ",".join(nodes)])
         if args.nccl_debug:
-            cmd_parts.extend(["--nccl-debug", args.nccl_debug])
-        cmd_parts.extend(["\\", "\n      --launch-script", "/tmp/tmpXXXXXX.sh"])
-        print(" ".join(cmd_parts))
-        print()
-        print("3. The launch script runs inside the container")
+            cmd_groups.append(["--nccl-debug", args.nccl_debug])
+        cmd_groups.append(["--launch-script", os.path.join(_launch_script_dir(), "launch-XXXXXX.sh")])
+        # Emit the whole block in one write
+        sys.stdout.write(
+            f"=== Generated Launch Script ===\n"
+            f"{script_content}\n"
+            f"=== What would be executed ===\n"
+            f"\n"
+            f"1. The above script is saved to a temporary file\n"
+            f"\n"
+            f"2. launch-cluster.sh is called with:\n"
+            f"   {_format_command(cmd_groups)}\n"
+            f"\n"
+            f"3. The launch script runs inside the container\n"
+        )
         return 0
     
-    # Write temporary launch script
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.sh', delete=False) as f:
+    import subprocess
+    import tempfile
+
+    # Write temporary launch script, in RAM-backed /dev/shm when available
+    # (launch-cluster.sh needs a real path it can docker cp, so no memfd)
+    with tempfile.NamedTemporaryFile(mode='w', prefix='launch-', suffix='.sh',
+                                     dir=_launch_script_dir(), delete=False) as f:
         f.write(script_content)
+        os.fchmod(f.fileno(), 0o755)
         temp_script = f.name
     
     try:
-        os.chmod(temp_script, 0o755)
-        
         # Build launch-cluster.sh command
         cmd = [str(LAUNCH_SCRIPT), "-t", container]
         
-        # Add mods
-        for mod in recipe.get("mods", []):
-            mod_path = SCRIPT_DIR / mod
-            if not mod_path.exists():
+        # Add mods (paths resolved and checked when the recipe was loaded)
+        for mod_path in recipe["_mod_paths"]:
+            if mod_path in recipe["_missing_mod_paths"]:
                 print(f"Warning: Mod path not found: {mod_path}")
-            cmd.extend(["--apply-mod", str(mod_path)])
+            cmd.extend(["--apply-mod", mod_path])
         
         # Add launch options
         if args.solo:
@@ -1173,6 +1977,22 @@ Examples:
         print()
         
         # Execute
+        if not args.daemon and sys.stdout.isatty():
+            # Nothing is left to do once the launcher exits, so hand this
+            # process over to it rather than idling as its parent for the
+            # whole serving session. The finally below won't run after exec;
+            # launch-cluster.sh removes the temp script once it's copied.
+            import signal
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Undo CPython's SIG_IGN, as subprocess does for its children,
+            # so pipelines in the launcher die quietly on a closed pipe
+            signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+            signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+            env = dict(os.environ, LAUNCH_SCRIPT_CLEANUP=os.path.realpath(temp_script))
+            os.execvpe(cmd[0], cmd, env)
+        
         result = subprocess.run(cmd)
         return result.returncode
         
@@ -538,6 +538,207 @@ EOF
     fi
 }
 
+# Test: Recipe parse cache is invalidated when the YAML changes
+test_recipe_cache_invalidation() {
+    log_test "Recipe cache picks up YAML edits"
+
+    temp_dir=$(mktemp -d)
+    temp_recipe="$temp_dir/cache-test.yaml"
+    cat > "$temp_recipe" << 'EOF'
+recipe_version: "1"
+name: Cache Test Before
+container: test-container
+command: echo "test"
+EOF
+
+    output_first=$("$PROJECT_DIR/run-recipe.py" "$temp_recipe" --dry-run --solo 2>&1 || true)
+
+    # Bump the mtime explicitly so the edit is visible on coarse-mtime filesystems
+    sed -i 's/Cache Test Before/Cache Test After/' "$temp_recipe"
+    touch -d "+1 minute" "$temp_recipe"
+    output_second=$("$PROJECT_DIR/run-recipe.py" "$temp_recipe" --dry-run --solo 2>&1 || true)
+
+    # Rewrite with a different size but put the old mtime back, as cp -p or
+    # rsync -a would; the size alone must invalidate the cache. Start from a
+    # cache written after the YAML's (past) mtime so mtime order can't help.
+    touch -d "-1 minute" "$temp_recipe"
+    "$PROJECT_DIR/run-recipe.py" "$temp_recipe" --dry-run --solo > /dev/null 2>&1 || true
+    touch -r "$temp_recipe" "$temp_dir/mtime-ref"
+    sed -i 's/Cache Test After/Cache Test Resized/' "$temp_recipe"
+    touch -r "$temp_dir/mtime-ref" "$temp_recipe"
+    output_third=$("$PROJECT_DIR/run-recipe.py" "$temp_recipe" --dry-run --solo 2>&1 || true)
+    cache_written=false
+    [[ -f "$temp_recipe.cache.json" ]] && cache_written=true
+    rm -rf "$temp_dir"
+
+    if echo "$output_first" | grep -q "Cache Test Before" && \
+       echo "$output_second" | grep -q "Cache Test After" && \
+       echo "$output_third" | grep -q "Cache Test Resized" && \
+       [[ "$cache_written" == "true" ]]; then
+        log_pass "Recipe cache is refreshed after YAML edits"
+    else
+        log_fail "Recipe cache returned stale data or was not written"
+        log_verbose "first: $output_first"
+        log_verbose "second: $output_second"
+        log_verbose "third: $output_third"
+    fi
+}
+
+test_discover_reuses_fresh_env() {
+    log_test "--discover reuses a fresh .env; --force-discover rescans"
+
+    temp_dir=$(mktemp -d)
+    # Stub autodiscover.sh: records that it ran and reports fixed values
+    cat > "$temp_dir/autodiscover.sh" << EOF
+detect_interfaces() { touch "$temp_dir/scanned"; ETH_IF=eth0; IB_IF=; }
+detect_local_ip() { LOCAL_IP=10.0.0.1; }
+detect_nodes() { NODES_ARG=10.0.0.1; }
+EOF
+    output=$(ENV_TEST_DIR="$temp_dir" python3 - "$PROJECT_DIR/run-recipe.py" 2>&1 << 'EOF'
+import importlib.util, os, pathlib, sys
+spec = importlib.util.spec_from_file_location("run_recipe", sys.argv[1])
+rr = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rr)
+temp_dir = pathlib.Path(os.environ["ENV_TEST_DIR"])
+rr.ENV_FILE = temp_dir / ".env"
+rr.AUTODISCOVER_SCRIPT = temp_dir / "autodiscover.sh"
+scanned = temp_dir / "scanned"
+
+def discover(flag):
+    sys.argv = ["run-recipe.py", flag]
+    before = rr.ENV_FILE.stat().st_mtime_ns
+    rc = rr.main()
+    ran = scanned.exists()
+    scanned.unlink(missing_ok=True)
+    return rc, ran, rr.ENV_FILE.stat().st_mtime_ns == before
+
+rr.save_env_file({"CLUSTER_NODES": "10.0.0.1", "LOCAL_IP": "10.0.0.1", "ETH_IF": "eth0", "IB_IF": ""})
+# Fresh .env: no scan, file untouched
+print("fresh:", discover("--discover"))
+# Forced scan with the same result: scan runs, file still untouched
+print("forced:", discover("--force-discover"))
+# Past the TTL: scan runs
+os.utime(rr.ENV_FILE, (0, 0))
+print("stale:", discover("--discover"))
+EOF
+)
+    rm -rf "$temp_dir"
+
+    if echo "$output" | grep -q "fresh: (0, False, True)" && \
+       echo "$output" | grep -q "forced: (0, True, True)" && \
+       echo "$output" | grep -q "stale: (0, True, True)"; then
+        log_pass ".env is reused while fresh and not rewritten when unchanged"
+    else
+        log_fail ".env reuse or --force-discover misbehaved"
+        log_verbose "$output"
+    fi
+}
+
+test_build_prompt_non_interactive() {
+    log_test "Build prompt declines without a TTY"
+
+    temp_dir=$(mktemp -d)
+    temp_recipe="$temp_dir/missing-image.yaml"
+    cat > "$temp_recipe" << 'EOF'
+recipe_version: "1"
+name: Missing Image Test
+container: spark-vllm-test-missing-image
+command: echo "test"
+EOF
+
+    output=$(env -u SPARK_VLLM_ASSUME_YES "$PROJECT_DIR/run-recipe.py" "$temp_recipe" --solo < /dev/null 2>&1)
+    exit_code=$?
+    rm -rf "$temp_dir"
+
+    if [[ $exit_code -eq 1 ]] && \
+       echo "$output" | grep -q "Build now? \[y/N\] n (non-interactive)" && \
+       echo "$output" | grep -q "Aborting."; then
+        log_pass "Build prompt answers 'n' and aborts with exit 1"
+    else
+        log_fail "Build prompt did not abort non-interactively (exit $exit_code)"
+        log_verbose "$output"
+    fi
+}
+
+test_env_file_round_trip() {
+    log_test ".env values survive save_env_file -> load_env_file and bash source"
+
+    temp_dir=$(mktemp -d)
+    # save_env_file() writes the file, a hand edit adds a trailing comment,
+    # then load_env_file() and bash (as stop-cluster.sh does) read it back
+    output=$(ENV_TEST_FILE="$temp_dir/.env" python3 - "$PROJECT_DIR/run-recipe.py" 2>&1 << 'EOF'
+import importlib.util, os, pathlib, subprocess, sys
+spec = importlib.util.spec_from_file_location("run_recipe", sys.argv[1])
+rr = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rr)
+rr.ENV_FILE = pathlib.Path(os.environ["ENV_TEST_FILE"])
+env = {
+    "CLUSTER_NODES": "192.168.1.10,192.168.1.11",
+    "LOCAL_IP": "192.168.1.10",
+    "NOTE": "node #2 is spare",
+    "RACK": "row4#2",
+    "QUOTED": 'say "hi" C:\\path\\',
+}
+rr.save_env_file(env)
+with open(rr.ENV_FILE, "a") as f:
+    f.write("ETH_IF=enp1s0f1np1  # trailing comment\n")
+    f.write("IB_IF=a#b\n")
+expected = dict(env, ETH_IF="enp1s0f1np1", IB_IF="a#b")
+loaded = rr.load_env_file()
+sourced = {
+    key: subprocess.run(
+        ["bash", "-c", f'source "$1" && printf %s "${key}"', "bash", str(rr.ENV_FILE)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    for key in expected
+}
+print("loaded ok" if loaded == expected else f"loaded mismatch: {loaded!r}")
+print("sourced ok" if sourced == expected else f"sourced mismatch: {sourced!r}")
+EOF
+)
+    rm -rf "$temp_dir"
+
+    if echo "$output" | grep -q "loaded ok" && echo "$output" | grep -q "sourced ok"; then
+        log_pass ".env round-trips through Python and bash"
+    else
+        log_fail ".env values changed on round-trip"
+        log_verbose "$output"
+    fi
+}
+
+test_normalize_image_ref() {
+    log_test "Image references are normalized the way 'docker images' lists them"
+
+    output=$(python3 - "$PROJECT_DIR/run-recipe.py" 2>&1 << 'EOF'
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("run_recipe", sys.argv[1])
+rr = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rr)
+cases = {
+    "vllm-node": "vllm-node:latest",
+    "vllm-node:tf5": "vllm-node:tf5",
+    "docker.io/library/x:t": "x:t",
+    "docker.io/nvidia/cuda": "nvidia/cuda:latest",
+    "localhost:5000/x": "localhost:5000/x:latest",
+    "localhost:5000/x:t": "localhost:5000/x:t",
+    "0123456789ab": None,
+    "sha256:" + "0" * 64: None,
+    "vllm-node@sha256:" + "0" * 64: None,
+}
+bad = {ref: rr._normalize_image_ref(ref) for ref in cases
+       if rr._normalize_image_ref(ref) != cases[ref]}
+print("all ok" if not bad else f"mismatch: {bad!r}")
+EOF
+)
+
+    if echo "$output" | grep -q "all ok"; then
+        log_pass "Tags, registry prefixes, image IDs and digests are handled"
+    else
+        log_fail "_normalize_image_ref returned unexpected references"
+        log_verbose "$output"
+    fi
+}
+
 # ==============================================================================
 # Launch-cluster.sh Command Line Verification Tests
 # ==============================================================================
@@ -1246,6 +1447,11 @@ main() {
     test_solo_only_fails_cluster
     test_solo_only_allows_solo
     test_conflicting_mode_flags_fail
+    test_recipe_cache_invalidation
+    test_env_file_round_trip
+    test_discover_reuses_fresh_env
+    test_build_prompt_non_interactive
+    test_normalize_image_ref
     echo ""
     
     # Summary